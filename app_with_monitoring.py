@@ -1,12 +1,19 @@
 """
 Flask API with Prometheus Monitoring and Advanced Logging - FIXED
 """
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, Response
 from flask_cors import CORS
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (Counter, Histogram, Gauge, CollectorRegistry, generate_latest,
+                               multiprocess, CONTENT_TYPE_LATEST)
 import numpy as np
+import orjson
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, MemoryHandler, QueueHandler, QueueListener
+import atexit
+import collections
+import functools
+import queue
+import threading
 from datetime import datetime
 import sys
 import os
@@ -36,11 +43,52 @@ console_handler.setFormatter(logging.Formatter(
     '%(asctime)s - %(levelname)s - %(message)s'
 ))
 
-# Configure logger
+# Buffer file writes so records hit disk in batches (errors flush immediately)
+buffered_file_handler = MemoryHandler(
+    capacity=512,
+    flushLevel=logging.ERROR,
+    target=file_handler
+)
+
+# Request threads only enqueue records; a background listener does the I/O
+queue_handler = QueueHandler(queue.Queue(-1))
+log_listener = None
+
+def _start_log_listener(*handlers):
+    """Start a listener thread draining a fresh log queue into handlers"""
+    global log_listener
+    queue_handler.queue = queue.Queue(-1)
+    log_listener = QueueListener(
+        queue_handler.queue, *handlers,
+        respect_handler_level=True
+    )
+    log_listener.start()
+
+def _restart_log_listener_after_fork():
+    """Threads don't survive fork (gunicorn --preload), so each worker starts its own"""
+    buffered_file_handler.buffer = []  # lines buffered in the parent stay with the parent
+    
+    # logging can't rotate one file from several processes, so forked workers
+    # log to stdout only; the rotating file stays with the parent process
+    _start_log_listener(console_handler)
+
+def _stop_logging():
+    """Drain queued records and flush buffered log lines on shutdown"""
+    log_listener.stop()
+    buffered_file_handler.close()
+
+_start_log_listener(buffered_file_handler, console_handler)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_log_listener_after_fork)
+atexit.register(_stop_logging)
+
+# Configure logger (all per-request lines are DEBUG, so INFO serving only logs
+# startup messages plus warnings/errors; set LOG_VERBOSITY=DEBUG to see them)
+LOG_VERBOSITY = os.environ.get('LOG_VERBOSITY', os.environ.get('LOG_LEVEL', 'INFO')).upper()
+
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.setLevel(LOG_VERBOSITY)
+logger.addHandler(queue_handler)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -58,9 +106,15 @@ prediction_histogram = Histogram(
     'Time spent processing prediction'
 )
 
+batch_prediction_histogram = Histogram(
+    'batch_prediction_duration_seconds',
+    'Time spent processing a batch prediction request'
+)
+
 model_confidence_gauge = Gauge(
     'model_confidence',
-    'Confidence of the last prediction'
+    'Confidence of the last prediction',
+    multiprocess_mode='livemostrecent'
 )
 
 http_requests_total = Counter(
@@ -69,38 +123,84 @@ http_requests_total = Counter(
     ['method', 'endpoint', 'status']
 )
 
+# Unknown paths and methods (404s, 405s, scans) share one label to keep series count bounded
+KNOWN_ENDPOINTS = {'/', '/predict', '/predict_batch', '/health', '/metrics'}
+KNOWN_METHODS = {'GET', 'POST', 'HEAD', 'OPTIONS'}
+
+@functools.lru_cache(maxsize=128)
+def _http_request_counter(method, endpoint, status):
+    """Memoized labelled child of http_requests_total (skips per-request label lookup)"""
+    return http_requests_total.labels(method=method, endpoint=endpoint, status=status)
+
+prediction_cache_hits = Counter(
+    'prediction_cache_hits_total',
+    'Predictions served from the response cache'
+)
+
+# Record start time at import so uptime is right under gunicorn as well as app.run()
+app.start_time = time.time()
+logger.info("Starting Heart Disease Prediction API with monitoring...")
+logger.info("Metrics available at: /metrics")
+
 # Load model at startup
 predictor = None
 try:
-    predictor = HeartDiseasePredictor()
+    predictor = HeartDiseasePredictor.get_default()
     logger.info("✓ Model loaded successfully")
 except Exception as e:
     logger.error(f"✗ Error loading model: {e}")
 
+# Warm up the model so the first real request doesn't pay cold-start costs
+WARMUP_SAMPLE = [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]
+WARMUP_ITERATIONS = 8
+
+if predictor is not None:
+    try:
+        warmup_start = time.time()
+        for _ in range(WARMUP_ITERATIONS):
+            predictor.predict(WARMUP_SAMPLE)
+        logger.info(f"✓ Model warmed up in {time.time() - warmup_start:.3f}s")
+    except Exception as e:
+        logger.error(f"✗ Error warming up model: {e}")
+
+# Memoize predictions by (quantized) feature vector; repeat requests skip the model
+PREDICTION_CACHE_SIZE = 4096
+_cache_state = threading.local()
+
+@functools.lru_cache(maxsize=PREDICTION_CACHE_SIZE)
+def _cached_predict(feature_key):
+    """Run the model for a feature tuple; only called on cache misses"""
+    _cache_state.miss = True
+    return predictor.predict(feature_key)
+
+def fast_json(payload, status=200):
+    """Serialize payload with orjson into a JSON response"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 @app.before_request
 def log_request_info():
     """Log incoming request details"""
-    logger.info(f'Request: {request.method} {request.path} from {request.remote_addr}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Request: %s %s from %s', request.method, request.path, request.remote_addr)
 
 @app.after_request
 def log_response_info(response):
     """Log response details and update metrics"""
-    logger.info(f'Response: {response.status_code}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Response: %s', response.status_code)
     
     # Update HTTP request counter
-    http_requests_total.labels(
-        method=request.method,
-        endpoint=request.path,
-        status=response.status_code
-    ).inc()
+    endpoint = request.path if request.path in KNOWN_ENDPOINTS else '/other'
+    method = request.method if request.method in KNOWN_METHODS else 'OTHER'
+    _http_request_counter(method, endpoint, response.status_code).inc()
     
     return response
 
 @app.route('/', methods=['GET'])
 def home():
     """Health check endpoint"""
-    logger.info("Home endpoint accessed")
-    return jsonify({
+    logger.debug("Home endpoint accessed")
+    return fast_json({
         'status': 'healthy',
         'service': 'Heart Disease Prediction API',
         'version': '1.0.0',
@@ -115,32 +215,39 @@ def predict():
     start_time = time.time()
     
     try:
-        # Get JSON data
-        data = request.get_json()
+        # Get JSON data (a malformed body is treated like a missing one)
+        try:
+            data = orjson.loads(request.get_data())
+        except orjson.JSONDecodeError:
+            data = None
         
         if not data or 'features' not in data:
             logger.warning("Missing 'features' in request")
             prediction_counter.labels(status='error', prediction_label='none').inc()
-            return jsonify({
+            return fast_json({
                 'error': 'Missing features in request',
                 'expected_format': {
                     'features': [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]
                 }
-            }), 400
+            }, status=400)
         
         features = data['features']
         
         # Validate features
         if not isinstance(features, list) or len(features) != 13:
-            logger.warning(f"Invalid features length: {len(features)}")
+            logger.warning("Invalid features length: %s", len(features))
             prediction_counter.labels(status='error', prediction_label='none').inc()
-            return jsonify({
+            return fast_json({
                 'error': 'Features must be a list of 13 values'
-            }), 400
+            }, status=400)
         
         # Make prediction
-        logger.info(f"Processing prediction request - Features: {features[:3]}...")
-        result = predictor.predict(features)
+        logger.debug("Processing prediction request - Features: %s...", features[:3])
+        feature_key = tuple(round(float(x), 4) for x in features)
+        _cache_state.miss = False
+        result = _cached_predict(feature_key)
+        if not _cache_state.miss:
+            prediction_cache_hits.inc()
         
         # Calculate latency
         latency = time.time() - start_time
@@ -153,13 +260,12 @@ def predict():
         model_confidence_gauge.set(result['confidence'])
         prediction_histogram.observe(latency)
         
-        logger.info(
-            f"Prediction: {result['prediction_label']}, "
-            f"Confidence: {result['confidence']:.2%}, "
-            f"Latency: {latency:.3f}s"
+        logger.debug(
+            "Prediction: %s, Confidence: %.2f%%, Latency: %.3fs",
+            result['prediction_label'], result['confidence'] * 100, latency
         )
         
-        return jsonify({
+        return fast_json({
             'success': True,
             'prediction': result['prediction'],
             'prediction_label': result['prediction_label'],
@@ -173,10 +279,92 @@ def predict():
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
         prediction_counter.labels(status='error', prediction_label='none').inc()
-        return jsonify({
+        return fast_json({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+MAX_BATCH_SIZE = 1000
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint: scores all instances in one model call
+    """
+    start_time = time.time()
+    
+    try:
+        # Get JSON data (a malformed body is treated like a missing one)
+        try:
+            data = orjson.loads(request.get_data())
+        except orjson.JSONDecodeError:
+            data = None
+        
+        if not data or 'instances' not in data:
+            logger.warning("Missing 'instances' in batch request")
+            prediction_counter.labels(status='error', prediction_label='none').inc()
+            return fast_json({
+                'error': 'Missing instances in request',
+                'expected_format': {
+                    'instances': [[63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]]
+                }
+            }, status=400)
+        
+        instances = data['instances']
+        
+        # Validate instances
+        if (not isinstance(instances, list) or not instances
+                or len(instances) > MAX_BATCH_SIZE
+                or not all(isinstance(row, list) and len(row) == 13 for row in instances)):
+            logger.warning("Invalid batch request")
+            prediction_counter.labels(status='error', prediction_label='none').inc()
+            return fast_json({
+                'error': f'Instances must be a list of 1-{MAX_BATCH_SIZE} lists of 13 values'
+            }, status=400)
+        
+        # Convert rows up front: strings raise, nulls become NaN, nested values add a dimension
+        try:
+            batch = np.asarray(instances, dtype=np.float32)
+        except (ValueError, TypeError):
+            batch = None
+        if batch is None or batch.ndim != 2 or not np.isfinite(batch).all():
+            logger.warning("Non-numeric values in batch request")
+            prediction_counter.labels(status='error', prediction_label='none').inc()
+            return fast_json({
+                'error': 'Instances must contain only numeric values'
+            }, status=400)
+
+        # Make predictions in a single vectorized call
+        results = predictor.predict(batch)
+        if isinstance(results, dict):
+            results = [results]
+        
+        # Calculate latency
+        latency = time.time() - start_time
+        
+        # Update metrics
+        for label, count in collections.Counter(r['prediction_label'] for r in results).items():
+            prediction_counter.labels(status='success', prediction_label=label).inc(count)
+        model_confidence_gauge.set(results[-1]['confidence'])
+        batch_prediction_histogram.observe(latency)
+        
+        logger.debug("Batch prediction: %d instances, Latency: %.3fs", len(results), latency)
+        
+        return fast_json({
+            'success': True,
+            'predictions': results,
+            'count': len(results),
+            'latency_seconds': latency,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
+        prediction_counter.labels(status='error', prediction_label='none').inc()
+        return fast_json({
             'success': False,
             'error': str(e)
-        }), 500
+        }, status=500)
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -185,10 +373,10 @@ def health():
         'status': 'healthy' if predictor is not None else 'unhealthy',
         'model_loaded': predictor is not None,
         'timestamp': datetime.now().isoformat(),
-        'uptime_seconds': time.time() - app.start_time if hasattr(app, 'start_time') else 0
+        'uptime_seconds': time.time() - app.start_time
     }
-    logger.debug(f"Health check: {health_status}")
-    return jsonify(health_status)
+    logger.debug("Health check: %s", health_status)
+    return fast_json(health_status)
 
 @app.route('/metrics', methods=['GET'])
 def metrics():
@@ -197,10 +385,14 @@ def metrics():
     Returns metrics in Prometheus format
     """
     logger.debug("Metrics endpoint accessed")
+    
+    # Under gunicorn, aggregate the per-worker metric files
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+    
     return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
 if __name__ == '__main__':
-    app.start_time = time.time()
-    logger.info("Starting Heart Disease Prediction API with monitoring...")
-    logger.info(f"Metrics available at: http://0.0.0.0:5000/metrics")
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
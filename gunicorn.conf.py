@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Heart Disease Prediction API
+
+Start with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Load the model once in the master; workers share it copy-on-write
+preload_app = True
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the Prometheus multiprocess directory"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
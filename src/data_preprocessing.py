@@ -54,9 +54,34 @@ class DataPreprocessor:
         return X_train, X_test, y_train, y_test
     
     def scale_features(self, X_train, X_test):
-        """Scale features using StandardScaler"""
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        """Scale features using StandardScaler (returned as float32)"""
+        # One float32 copy per split; everything below works in place on these
+        X_train_scaled = X_train.to_numpy(dtype=np.float32, copy=True)
+        X_test_scaled = X_test.to_numpy(dtype=np.float32, copy=True)
+        
+        # Fit the scaler's statistics directly (float64 accumulators), skipping
+        # StandardScaler's validation and incremental mean/variance machinery
+        mean = X_train_scaled.mean(axis=0, dtype=np.float64)
+        var = X_train_scaled.var(axis=0, dtype=np.float64)
+        scale = np.sqrt(var)
+        scale[scale == 0] = 1.0
+        
+        # Standardize with the exact float32 arithmetic inference uses
+        # (HeartDiseasePredictor.predict and the ONNX Scaler op), so tree
+        # split decisions match between training and serving
+        mean = mean.astype(np.float32)
+        scale = scale.astype(np.float32)
+        inv_scale = (1.0 / scale).astype(np.float32)
+        
+        self.scaler.mean_ = mean.astype(np.float64)
+        self.scaler.scale_ = scale.astype(np.float64)
+        self.scaler.var_ = self.scaler.scale_ ** 2
+        self.scaler.n_features_in_ = X_train_scaled.shape[1]
+        self.scaler.n_samples_seen_ = X_train_scaled.shape[0]
+        
+        for X_scaled in (X_train_scaled, X_test_scaled):
+            X_scaled -= mean
+            X_scaled *= inv_scale
         
         print(f"✓ Features scaled")
         
@@ -67,6 +92,15 @@ class DataPreprocessor:
         os.makedirs('models', exist_ok=True)
         joblib.dump(self.scaler, filepath)
         print(f"✓ Scaler saved to {filepath}")
+        
+        # Plain mean/scale arrays let inference standardize without sklearn
+        stats_path = os.path.splitext(filepath)[0] + '.npz'
+        np.savez(
+            stats_path,
+            mean=self.scaler.mean_.astype(np.float32),
+            scale=self.scaler.scale_.astype(np.float32)
+        )
+        print(f"✓ Scaler statistics saved to {stats_path}")
     
     def load_scaler(self, filepath='models/scaler.joblib'):
         """Load a saved scaler"""
@@ -1,17 +1,110 @@
 """
 Inference utilities for making predictions
 """
+import functools
+import hashlib
+import os
+
 import joblib
 import numpy as np
 
+try:
+    import onnxruntime as ort
+except ImportError:  # ONNX Runtime is optional; predictions fall back to sklearn
+    ort = None
+
+# ONNX metadata key holding the SHA-256 of the joblib model it was exported from
+ONNX_MODEL_HASH_KEY = 'model_sha256'
+
+def model_fingerprint(model_path):
+    """SHA-256 hex digest of a saved model file"""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _scaler_stats_path(scaler_path):
+    """Path of the .npz mean/scale export written next to the scaler"""
+    return os.path.splitext(scaler_path)[0] + '.npz'
+
+def _onnx_model_path(model_path):
+    """Path of the ONNX scaler+model pipeline written next to the model"""
+    return os.path.splitext(model_path)[0] + '.onnx'
+
+def _load_scaler_stats(scaler, scaler_path):
+    """Load float32 mean and inverse scale, preferring the .npz export"""
+    stats_path = _scaler_stats_path(scaler_path)
+    if os.path.exists(stats_path):
+        with np.load(stats_path) as stats:
+            mean, scale = stats['mean'], stats['scale']
+    else:
+        mean, scale = scaler.mean_, scaler.scale_
+    # Must match DataPreprocessor.scale_features exactly (float32 multiply by reciprocal)
+    mean = np.asarray(mean, dtype=np.float32)
+    inv_scale = (1.0 / np.asarray(scale, dtype=np.float32)).astype(np.float32)
+    return mean, inv_scale
+
+def _load_onnx_session(model_path):
+    """Create an ONNX Runtime session for the exported pipeline, if available"""
+    onnx_path = _onnx_model_path(model_path)
+    if ort is None or not os.path.exists(onnx_path):
+        return None
+    
+    # Run on the calling thread: no intra-op pool to fork (gunicorn --preload)
+    # and nothing to gain from one on 13-feature inputs
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    session = ort.InferenceSession(
+        onnx_path, sess_options=options, providers=['CPUExecutionProvider']
+    )
+    
+    # Only serve an export built from this exact model file
+    exported_hash = session.get_modelmeta().custom_metadata_map.get(ONNX_MODEL_HASH_KEY)
+    if exported_hash != model_fingerprint(model_path):
+        print(f"✗ Ignoring {onnx_path}: it was not exported from {model_path}")
+        return None
+    
+    print(f"✓ ONNX pipeline loaded from {onnx_path}")
+    return session
+
+@functools.lru_cache(maxsize=4)
+def _load_artifacts(model_path, scaler_path):
+    """Load model, scaler, scaling statistics and ONNX session once per path pair"""
+    # Memory-map plain numpy attributes (LogisticRegression coefficients,
+    # HistGradientBoosting node arrays). sklearn decision trees copy their node
+    # arrays into their own buffers on unpickling, so RandomForest gains nothing
+    model = joblib.load(model_path, mmap_mode='r')
+    scaler = joblib.load(scaler_path)
+    print(f"✓ Model loaded from {model_path}")
+    print(f"✓ Scaler loaded from {scaler_path}")
+    
+    mean, inv_scale = _load_scaler_stats(scaler, scaler_path)
+    session = _load_onnx_session(model_path)
+    
+    return model, scaler, mean, inv_scale, session
+
 class HeartDiseasePredictor:
+    _default = None
+    
     def __init__(self, model_path='models/best_model.joblib', 
                  scaler_path='models/scaler.joblib'):
         """Initialize predictor with model and scaler"""
-        self.model = joblib.load(model_path)
-        self.scaler = joblib.load(scaler_path)
-        print(f"✓ Model loaded from {model_path}")
-        print(f"✓ Scaler loaded from {scaler_path}")
+        (self.model, self.scaler, self._mean, self._inv_scale,
+         self._session) = _load_artifacts(
+            os.path.abspath(model_path), os.path.abspath(scaler_path)
+        )
+        if self._session is not None:
+            self._input_name = self._session.get_inputs()[0].name
+            self._proba_name = self._session.get_outputs()[1].name
+    
+    @classmethod
+    def get_default(cls):
+        """Return a shared predictor built from the default artifact paths"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
     
     def predict(self, features):
         """
@@ -24,27 +117,43 @@ class HeartDiseasePredictor:
             dict with prediction and probability
         """
         # Ensure 2D array
-        if len(np.array(features).shape) == 1:
-            features = np.array(features).reshape(1, -1)
-        else:
-            features = np.array(features)
+        arr = np.asarray(features, dtype=np.float32)
+        arr = arr.reshape(1, -1) if arr.ndim == 1 else arr
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        if arr.shape[1] != self._mean.shape[0]:
+            raise ValueError(
+                f"Expected {self._mean.shape[0]} features, got {arr.shape[1]}"
+            )
+        
+        # Make prediction (single probability call, labels derived from it)
+        if self._session is not None:
+            # The ONNX graph includes the scaler, so it takes raw features
+            probability = self._session.run(
+                [self._proba_name], {self._input_name: arr}
+            )[0]
+        else:
+            # Inline standardization skips sklearn's input validation
+            features_scaled = (arr - self._mean) * self._inv_scale
+            probability = self.model.predict_proba(features_scaled)
         
-        # Make prediction
-        prediction = self.model.predict(features_scaled)
-        probability = self.model.predict_proba(features_scaled)
+        prediction = np.argmax(probability, axis=1)
+        confidence = probability[np.arange(len(prediction)), prediction]
         
-        results = []
-        for i in range(len(features)):
-            results.append({
-                'prediction': int(prediction[i]),
-                'prediction_label': 'Heart Disease' if prediction[i] == 1 else 'No Heart Disease',
-                'probability_no_disease': float(probability[i][0]),
-                'probability_disease': float(probability[i][1]),
-                'confidence': float(probability[i][prediction[i]])
-            })
+        results = [
+            {
+                'prediction': pred,
+                'prediction_label': 'Heart Disease' if pred == 1 else 'No Heart Disease',
+                'probability_no_disease': p0,
+                'probability_disease': p1,
+                'confidence': conf
+            }
+            for pred, p0, p1, conf in zip(
+                prediction.tolist(),
+                probability[:, 0].tolist(),
+                probability[:, 1].tolist(),
+                confidence.tolist()
+            )
+        ]
         
         return results[0] if len(results) == 1 else results
 
@@ -53,7 +162,7 @@ if __name__ == "__main__":
     # Sample patient data
     sample_features = [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]
     
-    predictor = HeartDiseasePredictor()
+    predictor = HeartDiseasePredictor.get_default()
     result = predictor.predict(sample_features)
     
     print("\n=== Prediction Result ===")
@@ -4,11 +4,13 @@ Model training script with MLflow tracking
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
                              f1_score, roc_auc_score, confusion_matrix, 
                              classification_report)
 from sklearn.model_selection import cross_val_score
+from sklearn.pipeline import Pipeline
+from skl2onnx import to_onnx
 import joblib
 import mlflow
 import mlflow.sklearn
@@ -17,6 +19,7 @@ import seaborn as sns
 import os
 
 from data_preprocessing import DataPreprocessor
+from inference import ONNX_MODEL_HASH_KEY, model_fingerprint
 
 class ModelTrainer:
     def __init__(self, experiment_name="heart_disease_prediction"):
@@ -41,7 +44,7 @@ class ModelTrainer:
             metrics = self._calculate_metrics(y_test, y_pred, y_pred_proba)
             
             # Cross-validation
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+            cv_scores = cross_val_score(model, X_train, y_train, cv=5, n_jobs=-1)
             metrics['cv_mean'] = cv_scores.mean()
             metrics['cv_std'] = cv_scores.std()
             
@@ -71,7 +74,7 @@ class ModelTrainer:
         
         with mlflow.start_run(run_name="Random_Forest"):
             # Train model
-            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
             model.fit(X_train, y_train)
             
             # Predictions
@@ -82,10 +85,13 @@ class ModelTrainer:
             metrics = self._calculate_metrics(y_test, y_pred, y_pred_proba)
             
             # Cross-validation
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+            cv_scores = cross_val_score(model, X_train, y_train, cv=5, n_jobs=-1)
             metrics['cv_mean'] = cv_scores.mean()
             metrics['cv_std'] = cv_scores.std()
             
+            # Serve single-threaded: a per-call thread pool costs more than it saves on tiny batches
+            model.set_params(n_jobs=1)
+            
             # Log to MLflow
             mlflow.log_params({
                 "model_type": "RandomForest",
@@ -110,6 +116,47 @@ class ModelTrainer:
             
             return model, metrics
     
+    def train_hist_gbm(self, X_train, y_train, X_test, y_test):
+        """Train Histogram-based Gradient Boosting model"""
+        print("\n=== Training Histogram Gradient Boosting ===")
+        
+        with mlflow.start_run(run_name="Hist_Gradient_Boosting"):
+            # Train model
+            model = HistGradientBoostingClassifier(max_iter=200, random_state=42)
+            model.fit(X_train, y_train)
+            
+            # Predictions
+            y_pred = model.predict(X_test)
+            y_pred_proba = model.predict_proba(X_test)[:, 1]
+            
+            # Calculate metrics
+            metrics = self._calculate_metrics(y_test, y_pred, y_pred_proba)
+            
+            # Cross-validation
+            cv_scores = cross_val_score(model, X_train, y_train, cv=5, n_jobs=-1)
+            metrics['cv_mean'] = cv_scores.mean()
+            metrics['cv_std'] = cv_scores.std()
+            
+            # Log to MLflow
+            mlflow.log_params({
+                "model_type": "HistGradientBoosting",
+                "max_iter": 200,
+                "random_state": 42
+            })
+            mlflow.log_metrics(metrics)
+            mlflow.sklearn.log_model(model, "model")
+            
+            # Save model
+            joblib.dump(model, 'models/hist_gbm.joblib')
+            
+            self.models['hist_gbm'] = model
+            self.results['hist_gbm'] = metrics
+            
+            print(f"✓ Accuracy: {metrics['accuracy']:.4f}")
+            print(f"✓ ROC-AUC: {metrics['roc_auc']:.4f}")
+            
+            return model, metrics
+    
     def _calculate_metrics(self, y_true, y_pred, y_pred_proba):
         """Calculate evaluation metrics"""
         return {
@@ -149,15 +196,57 @@ class ModelTrainer:
         
         return comparison_df
     
-    def save_best_model(self):
-        """Save the best performing model"""
+    def save_best_model(self, scaler, X_sample, filepath='models/best_model.joblib'):
+        """Save the best performing model together with its ONNX export"""
         best_model_name = max(self.results, key=lambda x: self.results[x]['accuracy'])
         best_model = self.models[best_model_name]
+        onnx_path = os.path.splitext(filepath)[0] + '.onnx'
+        
+        # Write both artifacts to temporary files, then move them into place
+        tmp_model_path = filepath + '.tmp'
+        tmp_onnx_path = onnx_path + '.tmp'
+        
+        # joblib's default, spelled out: mmap_mode at load time needs an uncompressed file
+        joblib.dump(best_model, tmp_model_path, compress=0)
+        
+        try:
+            self.export_onnx(best_model, scaler, X_sample, tmp_onnx_path,
+                             model_fingerprint(tmp_model_path))
+        except Exception as e:
+            # Never leave an older export around to shadow the new model
+            print(f"✗ ONNX export failed for {best_model_name}: {e}")
+            print("  Inference will use the sklearn model")
+            for path in (tmp_onnx_path, onnx_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            os.replace(tmp_onnx_path, onnx_path)
+            print(f"✓ ONNX pipeline saved to {onnx_path}")
         
-        joblib.dump(best_model, 'models/best_model.joblib')
-        print(f"\n✓ Best model ({best_model_name}) saved to models/best_model.joblib")
+        os.replace(tmp_model_path, filepath)
+        print(f"\n✓ Best model ({best_model_name}) saved to {filepath}")
         
         return best_model
+    
+    @staticmethod
+    def export_onnx(model, scaler, X_sample, filepath, model_hash):
+        """Export the scaler + model pipeline to ONNX, tagged with the model's hash"""
+        pipeline = Pipeline([('scaler', scaler), ('model', model)])
+        
+        # Emit probabilities as a plain tensor instead of a list of dicts
+        onnx_model = to_onnx(
+            pipeline,
+            np.asarray(X_sample[:1], dtype=np.float32),
+            options={type(model): {'zipmap': False}}
+        )
+        
+        # Lets inference reject an export that doesn't belong to the saved model
+        meta = onnx_model.metadata_props.add()
+        meta.key = ONNX_MODEL_HASH_KEY
+        meta.value = model_hash
+        
+        with open(filepath, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
 
 def main():
     """Main training pipeline"""
@@ -176,10 +265,11 @@ def main():
     trainer = ModelTrainer()
     trainer.train_logistic_regression(X_train_scaled, y_train, X_test_scaled, y_test)
     trainer.train_random_forest(X_train_scaled, y_train, X_test_scaled, y_test)
+    trainer.train_hist_gbm(X_train_scaled, y_train, X_test_scaled, y_test)
     
     # Compare and save best model
     trainer.compare_models()
-    trainer.save_best_model()
+    trainer.save_best_model(preprocessor.scaler, X_train)
     
     print("\n✓ Training pipeline completed successfully!")
     print("✓ Run 'mlflow ui' to view experiment tracking")
@@ -1,10 +1,12 @@
 """
 Load testing script for API
 """
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import statistics
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 API_URL = "http://localhost:5000/predict"
 
@@ -15,11 +17,24 @@ SAMPLE_REQUESTS = [
     {"features": [37, 1, 2, 130, 250, 0, 1, 187, 0, 3.5, 0, 0, 2]},
 ]
 
-def make_request(request_data):
-    """Make a single prediction request"""
+# Serialize each sample once up front rather than on every request
+SAMPLE_PAYLOADS = [orjson.dumps(request_data) for request_data in SAMPLE_REQUESTS]
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Reuse keep-alive connections instead of a new TCP connection per request
+SESSION = requests.Session()
+
+def configure_session(num_workers):
+    """Size the connection pool so every worker thread keeps its own connection"""
+    adapter = HTTPAdapter(pool_connections=num_workers, pool_maxsize=num_workers)
+    SESSION.mount('http://', adapter)
+    SESSION.mount('https://', adapter)
+
+def make_request(payload):
+    """Make a single prediction request with a pre-serialized JSON payload"""
     start_time = time.time()
     try:
-        response = requests.post(API_URL, json=request_data, timeout=10)
+        response = SESSION.post(API_URL, data=payload, headers=JSON_HEADERS, timeout=10)
         latency = time.time() - start_time
         return {
             'success': response.status_code == 200,
@@ -39,21 +54,14 @@ def run_load_test(num_requests=100, num_workers=10):
     print(f"📍 Target: {API_URL}")
     print("")
     
-    results = []
+    configure_session(num_workers)
+    
+    payloads = [SAMPLE_PAYLOADS[i % len(SAMPLE_PAYLOADS)] for i in range(num_requests)]
+    
     start_time = time.time()
     
     with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        # Submit requests
-        futures = []
-        for i in range(num_requests):
-            request_data = SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)]
-            futures.append(executor.submit(make_request, request_data))
-        
-        # Collect results
-        for future in as_completed(futures):
-            results.append(future.result())
-            if len(results) % 10 == 0:
-                print(f"Progress: {len(results)}/{num_requests}")
+        results = list(executor.map(make_request, payloads))
     
     total_time = time.time() - start_time
     
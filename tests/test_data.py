@@ -4,6 +4,7 @@ Unit tests for data processing
 import pytest
 import pandas as pd
 import numpy as np
+from sklearn.preprocessing import StandardScaler
 import sys
 import os
 
@@ -56,6 +57,40 @@ class TestDataPreprocessing:
         assert X_train.shape[1] == X_test.shape[1]
         assert len(y_train) == len(X_train)
         assert len(y_test) == len(X_test)
+    
+    def test_feature_scaling(self):
+        """Test scaled features are float32 and standardized"""
+        preprocessor = DataPreprocessor()
+        df = preprocessor.load_data('data/heart_disease.csv')
+        df_clean = preprocessor.clean_data(df)
+        X, y = preprocessor.prepare_features(df_clean)
+        X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
+        X_train_scaled, X_test_scaled = preprocessor.scale_features(X_train, X_test)
+        
+        assert X_train_scaled.dtype == np.float32
+        assert X_test_scaled.dtype == np.float32
+        assert X_train_scaled.shape == X_train.shape
+        assert np.allclose(X_train_scaled.mean(axis=0), 0, atol=1e-5)
+        
+        # Matches a StandardScaler fitted the usual way
+        reference = StandardScaler().fit(X_train.to_numpy())
+        assert np.allclose(preprocessor.scaler.mean_, reference.mean_)
+        assert np.allclose(preprocessor.scaler.scale_, reference.scale_)
+        assert np.allclose(X_test_scaled, reference.transform(X_test.to_numpy()), atol=1e-5)
+    
+    def test_save_scaler_exports_statistics(self, tmp_path):
+        """Test saving the scaler also writes its mean/scale as .npz"""
+        preprocessor = DataPreprocessor()
+        df = preprocessor.load_data('data/heart_disease.csv')
+        df_clean = preprocessor.clean_data(df)
+        X, y = preprocessor.prepare_features(df_clean)
+        X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
+        preprocessor.scale_features(X_train, X_test)
+        preprocessor.save_scaler(str(tmp_path / 'scaler.joblib'))
+        
+        stats = np.load(tmp_path / 'scaler.npz')
+        assert np.allclose(stats['mean'], preprocessor.scaler.mean_)
+        assert np.allclose(stats['scale'], preprocessor.scaler.scale_)
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -39,6 +39,36 @@ class TestAPIIntegration:
         response = requests.post(f"{BASE_URL}/predict", json=payload)
         assert response.status_code == 400
     
+    def test_predict_batch_endpoint(self):
+        """Test batch prediction endpoint"""
+        payload = {
+            "instances": [
+                [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1],
+                [67, 1, 0, 160, 286, 0, 0, 108, 1, 1.5, 1, 3, 2]
+            ]
+        }
+        response = requests.post(f"{BASE_URL}/predict_batch", json=payload)
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data['success'] == True
+        assert data['count'] == 2
+        assert all(p['prediction'] in [0, 1] for p in data['predictions'])
+    
+    def test_predict_batch_invalid_input(self):
+        """Test batch prediction with a malformed instance"""
+        payload = {
+            "instances": [[63, 1, 3]]  # Too few features
+        }
+        response = requests.post(f"{BASE_URL}/predict_batch", json=payload)
+        assert response.status_code == 400
+    
+    def test_predict_batch_non_numeric_input(self):
+        """Test batch prediction with non-numeric and nested values"""
+        for row in (["a"] * 13, [None] * 13, [[1]] * 13):
+            response = requests.post(f"{BASE_URL}/predict_batch", json={"instances": [row]})
+            assert response.status_code == 400
+    
     def test_metrics_endpoint(self):
         """Test Prometheus metrics endpoint"""
         response = requests.get(f"{BASE_URL}/metrics")
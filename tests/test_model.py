@@ -4,13 +4,17 @@ Unit tests for model training and inference
 import pytest
 import numpy as np
 import joblib
+from sklearn.ensemble import RandomForestClassifier
+import shutil
 import sys
 import os
 
-# Add src to path
+# Add src to path (the repo root for src.*, src/ itself for the train script)
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from src.inference import HeartDiseasePredictor
+from src.data_preprocessing import DataPreprocessor
+from src.inference import HeartDiseasePredictor, model_fingerprint
 
 class TestModel:
     
@@ -26,9 +30,106 @@ class TestModel:
         assert hasattr(model, 'predict')
         assert hasattr(model, 'predict_proba')
     
+    def test_predictor_reuses_loaded_artifacts(self):
+        """Test repeated construction shares the cached model and scaler"""
+        first = HeartDiseasePredictor()
+        second = HeartDiseasePredictor()
+        
+        assert first.model is second.model
+        assert first.scaler is second.scaler
+        assert HeartDiseasePredictor.get_default() is HeartDiseasePredictor.get_default()
+    
+    def test_inline_scaling_matches_scaler(self):
+        """Test inline standardization agrees with the fitted scaler"""
+        predictor = HeartDiseasePredictor.get_default()
+        sample = np.array([[63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]], dtype=np.float32)
+        
+        inline = (sample - predictor._mean) * predictor._inv_scale
+        expected = predictor.scaler.transform(sample)
+        
+        assert np.allclose(inline, expected, atol=1e-5)
+    
+    def test_onnx_matches_sklearn(self, tmp_path):
+        """Test the exported ONNX pipeline serves the same RandomForest predictions as sklearn"""
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("skl2onnx")
+        train = pytest.importorskip("train")
+        
+        preprocessor = DataPreprocessor()
+        df = preprocessor.load_data('data/heart_disease.csv')
+        df_clean = preprocessor.clean_data(df)
+        X, y = preprocessor.prepare_features(df_clean)
+        X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
+        X_train_scaled, X_test_scaled = preprocessor.scale_features(X_train, X_test)
+        
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train_scaled, y_train)
+        model_path = tmp_path / 'best_model.joblib'
+        joblib.dump(model, model_path)
+        preprocessor.save_scaler(str(tmp_path / 'scaler.joblib'))
+        train.ModelTrainer.export_onnx(
+            model, preprocessor.scaler, X_train, str(tmp_path / 'best_model.onnx'),
+            model_fingerprint(str(model_path))
+        )
+        
+        predictor = HeartDiseasePredictor(str(model_path), str(tmp_path / 'scaler.joblib'))
+        assert predictor._session is not None
+        served = predictor.predict(X_test.to_numpy())
+        expected = model.predict_proba(X_test_scaled)
+        
+        # Same scaling, so split decisions agree; only float32 vote averaging differs
+        assert [r['prediction'] for r in served] == np.argmax(expected, axis=1).tolist()
+        assert np.allclose([r['probability_disease'] for r in served], expected[:, 1], atol=1e-5)
+    
+    def test_onnx_export_for_other_model_is_ignored(self, tmp_path):
+        """Test an ONNX file not exported from the model next to it is not served"""
+        if not os.path.exists('models/best_model.onnx'):
+            pytest.skip("ONNX pipeline not available")
+        
+        # Same file name layout, but the joblib model is a different one
+        model = RandomForestClassifier(n_estimators=5, random_state=0)
+        model.fit(np.random.rand(20, 13), np.arange(20) % 2)
+        joblib.dump(model, tmp_path / 'best_model.joblib')
+        shutil.copy('models/best_model.onnx', tmp_path / 'best_model.onnx')
+        
+        predictor = HeartDiseasePredictor(
+            str(tmp_path / 'best_model.joblib'), 'models/scaler.joblib'
+        )
+        assert predictor._session is None
+    
+    def test_served_probabilities_match_training(self, tmp_path):
+        """Test served RandomForest probabilities equal those on the training-scaled features"""
+        preprocessor = DataPreprocessor()
+        df = preprocessor.load_data('data/heart_disease.csv')
+        df_clean = preprocessor.clean_data(df)
+        X, y = preprocessor.prepare_features(df_clean)
+        X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
+        X_train_scaled, X_test_scaled = preprocessor.scale_features(X_train, X_test)
+        
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train_scaled, y_train)
+        joblib.dump(model, tmp_path / 'model.joblib')
+        preprocessor.save_scaler(str(tmp_path / 'scaler.joblib'))
+        
+        predictor = HeartDiseasePredictor(
+            str(tmp_path / 'model.joblib'), str(tmp_path / 'scaler.joblib')
+        )
+        served = predictor.predict(X_test.to_numpy())
+        expected = model.predict_proba(X_test_scaled)
+        
+        assert [r['probability_disease'] for r in served] == expected[:, 1].tolist()
+        assert [r['probability_no_disease'] for r in served] == expected[:, 0].tolist()
+    
+    def test_prediction_wrong_feature_count(self):
+        """Test prediction rejects inputs with the wrong number of features"""
+        predictor = HeartDiseasePredictor.get_default()
+        
+        with pytest.raises(ValueError):
+            predictor.predict([63, 1, 3])
+    
     def test_prediction_single(self):
         """Test single prediction"""
-        predictor = HeartDiseasePredictor()
+        predictor = HeartDiseasePredictor.get_default()
         sample = [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]
         result = predictor.predict(sample)
         
@@ -39,7 +140,7 @@ class TestModel:
     
     def test_prediction_batch(self):
         """Test batch prediction"""
-        predictor = HeartDiseasePredictor()
+        predictor = HeartDiseasePredictor.get_default()
         samples = [
             [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1],
             [67, 1, 0, 160, 286, 0, 0, 108, 1, 1.5, 1, 3, 2]
@@ -48,6 +149,20 @@ class TestModel:
         
         assert len(results) == 2
         assert all('prediction' in r for r in results)
+    
+    def test_prediction_batch_matches_single(self):
+        """Test batch prediction agrees with per-sample predictions"""
+        predictor = HeartDiseasePredictor.get_default()
+        samples = [
+            [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1],
+            [67, 1, 0, 160, 286, 0, 0, 108, 1, 1.5, 1, 3, 2]
+        ]
+        results = predictor.predict(samples)
+        
+        for sample, batch_result in zip(samples, results):
+            single_result = predictor.predict(sample)
+            assert batch_result['prediction'] == single_result['prediction']
+            assert batch_result['confidence'] == pytest.approx(single_result['confidence'])
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
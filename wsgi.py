@@ -0,0 +1,7 @@
+"""
+WSGI entry point for running the API under gunicorn
+"""
+from app_with_monitoring import app
+
+if __name__ == "__main__":
+    app.run(host='0.0.0.0', port=5000)